@@ -5,25 +5,42 @@ This module contains the primary logic for loading the YOLOv8 model
 and performing object detection in a separate, non-blocking thread.
 """
 
+import importlib.util
 import queue
 import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
 from pathlib import Path
 from types import TracebackType
-from typing import Self
+from typing import Literal, NamedTuple, Self
 
+import cv2
 import numpy as np
-from pydantic import BaseModel, Field
+import torch
+from pydantic import BaseModel, Field, PositiveInt
+from ultralytics.engine.results import Results
 from ultralytics.models import YOLO
 
 type BoxCoordinate = tuple[float, float, float, float]
 
+# Letterboxed inputs are padded up to a multiple of the largest YOLOv8 stride,
+# using the same fill value as Ultralytics.
+_LETTERBOX_STRIDE = 32
+_LETTERBOX_FILL = 114
 
-class DetectionResult(BaseModel):
+# Weight of the newest sample in the smoothed inference latency
+_LATENCY_SMOOTHING = 0.1
+
+
+class DetectionResult(NamedTuple):
 	"""
 	Represents a single object detection made by the YOLO model.
 
 	This is a data-transfer object (DTO) used to pass structured results
-	from the inference thread to the UI thread.
+	from the inference thread to the UI thread. It is created for every
+	detection in every frame, so it is a plain named tuple rather than a
+	validated model; use _asdict() to serialize it.
 
 	Attributes:
 	    box: Bounding box coordinates in (x1, y1, x2, y2) format(BoxCoordinate).
@@ -32,12 +49,56 @@ class DetectionResult(BaseModel):
 	    confidence: The confidence score of the detection (0.0 to 1.0).
 	"""
 
-	box: BoxCoordinate = Field(
-		..., description="Bounding box coordinates (x1, y1, x2, y2)"
-	)
-	class_id: int = Field(..., description="The ID of the detected class")
-	class_name: str = Field(..., description="The name of the detected class")
-	confidence: float = Field(..., description="The confidence score of the detection")
+	box: BoxCoordinate
+	class_id: int
+	class_name: str
+	confidence: float
+
+
+@dataclass(slots=True, frozen=True)
+class InferenceEvent:
+	"""
+	A single message posted by the inference thread to its output queue.
+
+	Consumers dispatch on the error attribute instead of type-checking each
+	item; it is None for every regular result.
+
+	Attributes:
+	    detections: The detections found in one processed frame.
+	    error: A description of the failure if the engine could not run.
+	"""
+
+	detections: list[DetectionResult] = field(default_factory=list)
+	error: str | None = None
+
+
+@dataclass(slots=True, frozen=True)
+class EngineStats:
+	"""
+	A snapshot of the InferenceEngine's throughput counters.
+
+	Comparing the counters shows where a pipeline is bottlenecked: frames
+	dropped before inference mean the model is too slow for the producer,
+	while results dropped from a bounded output queue, or a deep unbounded
+	one, mean the consumer is falling behind.
+
+	Attributes:
+	    submitted: Frames submitted since the engine was created.
+	    processed: Frames that went through the model.
+	    dropped: Frames replaced by newer ones before they were processed.
+	    output_dropped: Results discarded unread to make room in a full output queue.
+	    pending: Frames currently waiting for inference.
+	    output_depth: Events waiting in the output queue.
+	    latency_ms: Smoothed duration of one model call, in milliseconds.
+	"""
+
+	submitted: int
+	processed: int
+	dropped: int
+	output_dropped: int
+	pending: int
+	output_depth: int
+	latency_ms: float
 
 
 class InferenceConfig(BaseModel):
@@ -50,6 +111,19 @@ class InferenceConfig(BaseModel):
 	    model_path: The file path to the YOLOv8 model weights (.pt file).
 	    confidence_threshold: The minimum confidence score to consider a detection valid.
 	    image_size: The square dimension (e.g., 640) to which input images are resized.
+	    precision: Numeric precision for inference. "fp16" uses half precision
+	        on CUDA devices; "int8" runs a quantized OpenVINO export of the model
+	        and needs the "int8" extra installed.
+	    calibration_data: The dataset YAML used to calibrate the INT8 export. Only
+	        needed the first time a model is exported at a given image size.
+	    warmup_iterations: The number of dummy predictions run after loading the model.
+	    frame_shape: The expected (height, width) of incoming frames. When set, the
+	        warmup runs at this resolution so the first real frame hits warm paths.
+	    max_batch: The maximum number of pending frames run through the model in a
+	        single call when frames arrive faster than they can be processed. The
+	        default of 1 always infers only the newest frame; larger values trade
+	        freshness for throughput. Ignored for "int8", whose export has a static
+	        batch size of 1.
 	"""
 
 	model_path: Path = Field(
@@ -61,6 +135,79 @@ class InferenceConfig(BaseModel):
 	image_size: int = Field(
 		640, gt=0, description="The size for inference input images"
 	)
+	precision: Literal["fp32", "fp16", "int8"] = Field(
+		"fp32", description="Numeric precision used for inference"
+	)
+	calibration_data: Path | None = Field(
+		None, description="Dataset YAML used to calibrate the INT8 export"
+	)
+	warmup_iterations: int = Field(
+		3, ge=1, description="Number of warmup predictions after model load"
+	)
+	frame_shape: tuple[PositiveInt, PositiveInt] | None = Field(
+		None, description="Expected (height, width) of input frames"
+	)
+	max_batch: int = Field(
+		1, ge=1, description="Maximum number of frames per model call"
+	)
+
+
+class _Letterbox(NamedTuple):
+	"""
+	Geometry of a frame resized and padded to the model input size.
+
+	Attributes:
+	    scale: The resize factor applied to the source frame.
+	    pad: The (left, top) padding in pixels.
+	    size: The (width, height) of the resized frame, before padding.
+	    source_size: The (width, height) of the source frame.
+	    shape: The (height, width) of the padded model input.
+	"""
+
+	scale: float
+	pad: tuple[int, int]
+	size: tuple[int, int]
+	source_size: tuple[int, int]
+	shape: tuple[int, int]
+
+
+def _compute_letterbox(height: int, width: int, image_size: int) -> _Letterbox:
+	"""
+	Computes the letterbox Ultralytics would apply to a frame of the given size.
+
+	Mirrors its rectangular inference path: the frame is scaled to fit within
+	image_size and padded, centered, up to the next stride multiple. A frame
+	prepared this way passes through Ultralytics' own letterboxing untouched.
+
+	Args:
+	    height: The source frame height.
+	    width: The source frame width.
+	    image_size: The model input size.
+
+	Returns:
+	    The letterbox geometry for the frame.
+	"""
+	scale = min(image_size / height, image_size / width)
+	new_width, new_height = round(width * scale), round(height * scale)
+	pad_w = (image_size - new_width) % _LETTERBOX_STRIDE / 2
+	pad_h = (image_size - new_height) % _LETTERBOX_STRIDE / 2
+	left, right = round(pad_w - 0.1), round(pad_w + 0.1)
+	top, bottom = round(pad_h - 0.1), round(pad_h + 0.1)
+
+	return _Letterbox(
+		scale=scale,
+		pad=(left, top),
+		size=(new_width, new_height),
+		source_size=(width, height),
+		shape=(new_height + top + bottom, new_width + left + right),
+	)
+
+
+class _PreparedFrame(NamedTuple):
+	"""A letterboxed frame waiting for inference, with its geometry."""
+
+	image: np.ndarray
+	letterbox: _Letterbox
 
 
 class InferenceEngine:
@@ -76,21 +223,54 @@ class InferenceEngine:
 	def __init__(
 		self,
 		config: InferenceConfig,
-		output_queue: queue.Queue[list[DetectionResult] | str],
+		output_queue: queue.Queue[InferenceEvent],
 	) -> None:
 		"""
 		Initializes the InferenceEngine with its configuration and output queue.
 
 		Args:
 		    config: Configuration object with model path and other settings.
-		    output_queue: A thread-safe queue to send results or errors to the UI.
+		    output_queue: A thread-safe queue to send result and error events to the UI.
+		        When bounded (e.g. maxsize=1), the oldest unread item is dropped
+		        to make room, so a slow consumer always sees the latest results.
 		"""
 		self.config = config
 		self._output_queue = output_queue
+		# Set once startup is over, so producers can wait on it and their first
+		# frames do not queue up behind the warmup. It is also set when loading
+		# fails or the engine is stopped, so waiters must check is_running().
+		self.started_event = threading.Event()
 		self._stop_event = threading.Event()
 		self._model: YOLO | None = None
-		self._frame_to_process: np.ndarray | None = None
+		self._names: dict[int, str] = {}
+		# Per-call prediction settings, resolved once rather than through
+		# Pydantic attribute access on every call.
+		self._imgsz = config.image_size
+		self._conf = config.confidence_threshold
+		self._half = config.precision == "fp16"
+		self._max_batch = 1 if config.precision == "int8" else config.max_batch
+		# Submitted frames are copied into a reusable pool, sized lazily from
+		# the first frame, so the hot path allocates nothing per frame. It holds
+		# up to max_batch pending frames, up to max_batch frames being processed
+		# and the one a producer is writing; concurrent producers get extra
+		# buffers on demand, which are not kept once released.
+		self._pool_size = 2 * self._max_batch + 1
+		self._pool_spec: tuple[tuple[int, ...], np.dtype] | None = None
+		self._letterbox: _Letterbox | None = None
+		self._free_buffers: list[np.ndarray] = []
+		self._pending_frames: deque[_PreparedFrame] = deque()
 		self._frame_lock = threading.Lock()
+		# Throughput counters, updated under the frame lock
+		self._submitted = 0
+		self._processed = 0
+		self._dropped = 0
+		self._output_dropped = 0
+		self._latency_ms = 0.0
+		self._frame_event = threading.Event()
+		# Set while fewer than max_batch frames are pending, for producers
+		# that want to be paced by the engine instead of sleeping.
+		self._ready_for_frame = threading.Event()
+		self._ready_for_frame.set()
 		self._thread: threading.Thread | None = None
 
 	def __enter__(self) -> Self:
@@ -116,9 +296,20 @@ class InferenceEngine:
 		self.stop()
 
 	def start(self) -> None:
-		"""Starts the background inference thread."""
+		"""
+		Starts the background inference thread.
+
+		An engine that was stopped, or whose model failed to load, can be
+		started again; the model is then loaded afresh.
+		"""
 		if self._thread is not None and self._thread.is_alive():
-			return  # Thread is already running
+			if not self._stop_event.is_set():
+				return  # Thread is already running
+			self._thread.join()  # A stopped loop has only its exit left to run
+
+		with self._frame_lock:
+			self._stop_event.clear()
+			self.started_event.clear()
 
 		self._thread = threading.Thread(target=self._run_loop, daemon=True)
 		self._thread.start()
@@ -128,89 +319,424 @@ class InferenceEngine:
 		The main loop of the inference thread.
 
 		Loads the model and then enters a loop, continuously processing
-		the most recent frame provided to the engine.
+		the most recent frames provided to the engine. Frames that piled up
+		while the previous call was running are processed as one batch.
 		"""
 		try:
-			self._model = YOLO(self.config.model_path)
-			# Perform a dummy prediction to initialize the model
-			# and avoid a long delay on the first frame.
-			dummy_img = np.zeros(
-				(self.config.image_size, self.config.image_size, 3), dtype=np.uint8
-			)
-			self._model(dummy_img, imgsz=self.config.image_size, verbose=False)
+			self._model = self._load_model()
+			self._names = self._model.names
+			self._warmup()
 		except Exception as e:
-			self._output_queue.put(f"ERROR: Failed to load model: {e}")
+			self._publish(InferenceEvent(error=f"Failed to load model: {e}"))
+			self._mark_stopped()
 			return
 
+		self.started_event.set()
+
 		while not self._stop_event.is_set():
-			frame: np.ndarray | None = None
+			# Block until a frame is submitted instead of polling; the timeout
+			# only bounds how long a missed stop signal can go unnoticed.
+			if not self._frame_event.wait(timeout=0.5):
+				continue
+			if self._stop_event.is_set():
+				break
+
+			# Clear before consuming so a frame submitted meanwhile re-arms the event.
+			self._frame_event.clear()
 			with self._frame_lock:
-				if self._frame_to_process is not None:
-					frame = self._frame_to_process
-					self._frame_to_process = None  # Consume the frame
+				frames = list(self._pending_frames)
+				self._pending_frames.clear()  # Consume the frames
+				self._ready_for_frame.set()
+			if not frames:
+				continue
+
+			error: str | None = None
+			batch_results: list[list[DetectionResult]] = []
+			started_at = time.perf_counter()
+			try:
+				batch_results = self._process_frames(frames)
+			except Exception as e:
+				# Report the failure but keep serving later frames
+				error = f"Inference failed: {e}"
+			elapsed_ms = (time.perf_counter() - started_at) * 1000
 
-			if frame is not None:
-				results: list[DetectionResult] = self._process_frame(frame)
-				self._output_queue.put(results)
-			else:
-				# Wait briefly to prevent busy-waiting and yield CPU when no frames are available.
-				self._stop_event.wait(0.01)
+			with self._frame_lock:
+				if error is None:
+					if self._processed == 0:
+						self._latency_ms = elapsed_ms  # Seed with the first sample
+					else:
+						self._latency_ms += _LATENCY_SMOOTHING * (
+							elapsed_ms - self._latency_ms
+						)
+					self._processed += len(frames)
+				for prepared in frames:
+					self._release_buffer(prepared)
+
+			if error is not None:
+				self._publish(InferenceEvent(error=error))
+			for results in batch_results:
+				self._publish(InferenceEvent(results))
+
+		self._mark_stopped()
+
+	def _mark_stopped(self) -> None:
+		"""
+		Flags the engine as stopped and releases every waiting producer.
+
+		Nothing drains pending frames once the loop has exited, so the ready
+		event must stay set until the engine is started again; submit_frame
+		checks the stop flag under the same lock before clearing it. The started event is set too,
+		so producers waiting for startup are not left hanging.
+		"""
+		with self._frame_lock:
+			self._stop_event.set()
+			self._ready_for_frame.set()
+		self.started_event.set()
+
+	def is_running(self) -> bool:
+		"""
+		Reports whether the engine has started and is processing frames.
+
+		Producers waiting on started_event should check this once it is set:
+		it is False if the model failed to load (an error event is then on the
+		output queue) or the engine was stopped.
+
+		Returns:
+		    True if the inference thread is up and serving frames.
+		"""
+		return self.started_event.is_set() and not self._stop_event.is_set()
 
-	def _process_frame(self, frame: np.ndarray) -> list[DetectionResult]:
+	def _publish(self, item: InferenceEvent) -> None:
 		"""
-		Processes a single image frame to perform object detection.
+		Puts an item on the output queue without blocking the inference thread.
+
+		If the queue is bounded and full, the oldest unread item is discarded
+		until the new one fits, so results never pile up behind a slow
+		consumer.
 
 		Args:
-		    frame: The input image frame in NumPy array format.
+		    item: The event to deliver to the consumer.
+		"""
+		while True:
+			try:
+				self._output_queue.put_nowait(item)
+				return
+			except queue.Full:
+				try:
+					self._output_queue.get_nowait()  # Drop the stalest item
+				except queue.Empty:
+					continue  # The consumer emptied the queue in the meantime
+				# Account for the dropped item so output_queue.join() still returns
+				self._output_queue.task_done()
+				with self._frame_lock:
+					self._output_dropped += 1
+
+	def _load_model(self) -> YOLO:
+		"""
+		Loads the YOLO model at the configured precision.
+
+		FP16 needs no conversion here; it is requested per prediction and only
+		takes effect on CUDA devices. For INT8 the weights are exported once per
+		image size to a quantized OpenVINO model next to the original file, and
+		that export is reused on later starts.
 
 		Returns:
-		    A list of DetectionResult objects for all valid detections.
+		    The model to run predictions with.
+
+		Raises:
+		    RuntimeError: If INT8 is requested without the "int8" extra installed.
+		    ValueError: If an INT8 export is needed but no calibration data is set.
+		"""
+		model_path = self.config.model_path
+		if self.config.precision != "int8":
+			return YOLO(model_path)
+
+		# Checked up front so Ultralytics does not try to pip-install them
+		if importlib.util.find_spec("openvino") is None:
+			raise RuntimeError(
+				'INT8 precision requires the "int8" extra (openvino, nncf)'
+			)
+
+		# The export has a static input shape, so it is only valid for one size
+		export_dir = model_path.with_name(
+			f"{model_path.stem}_int8_{self._imgsz}_openvino_model"
+		)
+		if not export_dir.exists():
+			if importlib.util.find_spec("nncf") is None:
+				raise RuntimeError(
+					'INT8 export requires the "int8" extra (openvino, nncf)'
+				)
+			if self.config.calibration_data is None:
+				raise ValueError("INT8 export requires calibration_data to be set")
+
+			exported = YOLO(model_path).export(
+				format="openvino",
+				int8=True,
+				imgsz=self._imgsz,
+				data=str(self.config.calibration_data),
+			)
+			Path(exported).rename(export_dir)
+
+		return YOLO(export_dir, task="detect")
+
+	def _warmup(self) -> None:
+		"""
+		Runs dummy predictions to avoid a long delay on the first real frame.
+
+		The dummy image has the letterboxed shape of the configured frame
+		shape, since the input shape decides which kernels get compiled and,
+		with cuDNN benchmarking enabled, which ones get autotuned.
 		"""
 		if self._model is None:
-			return []
+			return
+
+		torch.backends.cudnn.benchmark = True
+
+		height, width = self.config.frame_shape or (self._imgsz, self._imgsz)
+		letterbox = _compute_letterbox(height, width, self._imgsz)
+		dummy_img = np.zeros((*letterbox.shape, 3), dtype=np.uint8)
+		for _ in range(self.config.warmup_iterations):
+			self._model(
+				dummy_img,
+				imgsz=self._imgsz,
+				conf=self._conf,
+				half=self._half,
+				verbose=False,
+			)
 
-		# The result from the model is an iterable of result objects
+	def _process_frames(
+		self, frames: list[_PreparedFrame]
+	) -> list[list[DetectionResult]]:
+		"""
+		Processes a batch of prepared frames to perform object detection.
+
+		All frames go through a single model call, amortizing the per-call
+		pre/post-processing overhead. A lone frame is passed as-is so the
+		idle case behaves exactly like single-frame inference.
+
+		Args:
+		    frames: The letterboxed input frames.
+
+		Returns:
+		    One list of DetectionResult objects per frame, in input order.
+		"""
+		if self._model is None:
+			return [[] for _ in frames]
+
+		# The result from the model is one result object per input frame
+		images = [prepared.image for prepared in frames]
 		results = self._model(
-			frame,
-			imgsz=self.config.image_size,
-			conf=self.config.confidence_threshold,
+			images[0] if len(images) == 1 else images,
+			imgsz=self._imgsz,
+			conf=self._conf,
+			half=self._half,
 			verbose=False,
 		)
 
+		return [
+			self._extract_detections(res, prepared.letterbox)
+			for res, prepared in zip(results, frames, strict=True)
+		]
+
+	def _extract_detections(
+		self, res: Results, letterbox: _Letterbox
+	) -> list[DetectionResult]:
+		"""
+		Converts the model output for a single frame into detection results.
+
+		Boxes are mapped from the letterboxed input back to source frame
+		coordinates.
+
+		Args:
+		    res: The Ultralytics result object for one frame.
+		    letterbox: The geometry the frame was prepared with.
+
+		Returns:
+		    A list of DetectionResult objects for all valid detections.
+		"""
+		# res.boxes.data is a tensor (or array) of [x1, y1, x2, y2, conf, cls]
+		boxes_data = res.boxes.data
+		if isinstance(boxes_data, torch.Tensor):
+			data = boxes_data.cpu().numpy()
+		else:
+			data = np.asarray(boxes_data)
+		if data.ndim != 2 or data.shape[1] != 6:
+			return []  # Skip malformed results
+
+		# Undo the letterbox on all boxes at once. On CPU the array shares
+		# memory with the result tensor, so work on a copy of the box columns.
+		boxes_xyxy = data[:, :4].copy()
+		left, top = letterbox.pad
+		width, height = letterbox.source_size
+		boxes_xyxy -= (left, top, left, top)
+		boxes_xyxy /= letterbox.scale
+		np.clip(boxes_xyxy, 0, (width, height, width, height), out=boxes_xyxy)
+
+		# Split the columns once and convert each to Python scalars in a
+		# single C-level pass rather than unpacking row by row.
+		boxes = boxes_xyxy.tolist()
+		confidences = data[:, 4].tolist()
+		class_ids = data[:, 5].astype(np.int32).tolist()
+
+		names = self._names
 		detections: list[DetectionResult] = []
-		for res in results:
-			# res.boxes.data is a tensor of [x1, y1, x2, y2, conf, cls]
-			for row in res.boxes.data.tolist():
-				if len(row) != 6:
-					continue  # Skip malformed results
-
-				(x1, y1, x2, y2, confidence, class_id_float) = row
-				class_id = int(class_id_float)
-
-				detections.append(
-					DetectionResult(
-						box=(x1, y1, x2, y2),
-						class_id=class_id,
-						class_name=self._model.names.get(class_id, "Unknown"),
-						confidence=confidence,
-					)
+		for (x1, y1, x2, y2), confidence, class_id in zip(
+			boxes, confidences, class_ids, strict=True
+		):
+			detections.append(
+				DetectionResult(
+					box=(x1, y1, x2, y2),
+					class_id=class_id,
+					class_name=names.get(class_id, "Unknown"),
+					confidence=confidence,
 				)
+			)
 		return detections
 
 	def submit_frame(self, frame: np.ndarray) -> None:
 		"""
 		Submits a new frame to be processed by the inference thread.
 
-		This method is thread-safe.
+		This method is thread-safe and may be called from several producer
+		threads at once. The frame is resized and padded to the
+		model input size on the calling thread, overlapping preprocessing
+		with inference, and written into an engine-owned buffer, so the
+		caller may reuse its array as soon as this returns. Up to max_batch
+		of the latest frames are kept; once that many are waiting, the
+		oldest one is dropped.
+
+		Args:
+		    frame: The latest BGR frame captured from the camera.
+		"""
+		with self._frame_lock:
+			buffer, letterbox = self._acquire_buffer(frame)
+
+		# The buffer is owned by the producer until it is published below,
+		# so the resize itself happens outside the lock. Only the unpadded
+		# region is written; the padding was filled when the pool was built.
+		left, top = letterbox.pad
+		width, height = letterbox.size
+		region = buffer[top : top + height, left : left + width]
+		try:
+			if letterbox.size == letterbox.source_size:
+				np.copyto(region, frame)
+			else:
+				cv2.resize(
+					frame, letterbox.size, dst=region, interpolation=cv2.INTER_LINEAR
+				)
+		except Exception:
+			# Hand the buffer back so a rejected frame does not shrink the pool
+			with self._frame_lock:
+				self._release_buffer(_PreparedFrame(buffer, letterbox))
+			raise
+
+		with self._frame_lock:
+			self._submitted += 1
+			if len(self._pending_frames) >= self._max_batch:
+				self._release_buffer(self._pending_frames.popleft())  # Drop the stalest
+				self._dropped += 1
+			self._pending_frames.append(_PreparedFrame(buffer, letterbox))
+			if (
+				len(self._pending_frames) >= self._max_batch
+				and not self._stop_event.is_set()
+			):
+				self._ready_for_frame.clear()
+		self._frame_event.set()
+
+	def wait_until_ready(self, timeout: float | None = None) -> bool:
+		"""
+		Blocks until the engine has room for another frame.
+
+		Producers can call this between submissions instead of sleeping. It
+		returns immediately while fewer than max_batch frames are pending and
+		blocks while the inference thread is behind, so frames are submitted
+		at the rate of the slowest stage. It also returns, and keeps returning
+		immediately, once the engine has stopped or its model failed to load;
+		in the latter case an error event is posted to the output queue.
 
 		Args:
-		    frame: The latest frame captured from the camera.
+		    timeout: The maximum number of seconds to wait, or None to wait
+		        indefinitely.
+
+		Returns:
+		    True if the engine is ready for a frame or has stopped, False if the
+		    wait timed out.
 		"""
+		return self._ready_for_frame.wait(timeout)
+
+	def stats(self) -> EngineStats:
+		"""
+		Returns a snapshot of the engine's throughput counters.
+
+		This method is thread-safe and cheap enough to poll from a UI timer.
+
+		Returns:
+		    The current counters and queue depths.
+		"""
+		output_depth = self._output_queue.qsize()
 		with self._frame_lock:
-			self._frame_to_process = frame
+			return EngineStats(
+				submitted=self._submitted,
+				processed=self._processed,
+				dropped=self._dropped,
+				output_dropped=self._output_dropped,
+				pending=len(self._pending_frames),
+				output_depth=output_depth,
+				latency_ms=self._latency_ms,
+			)
+
+	def _acquire_buffer(self, frame: np.ndarray) -> tuple[np.ndarray, _Letterbox]:
+		"""
+		Takes a free pool buffer for a frame of this shape and dtype.
+
+		The pool and its letterbox geometry are rebuilt when the frame
+		geometry changes. Must be called with the frame lock held.
+
+		Args:
+		    frame: The frame that is about to be written into the buffer.
+
+		Returns:
+		    A buffer exclusively owned by the caller until it is released,
+		    and the letterbox geometry to write the frame with.
+		"""
+		spec = (frame.shape, frame.dtype)
+		if spec != self._pool_spec or self._letterbox is None:
+			height, width = frame.shape[:2]
+			letterbox = _compute_letterbox(height, width, self._imgsz)
+			shape = letterbox.shape + frame.shape[2:]
+			self._pool_spec = spec
+			self._letterbox = letterbox
+			self._free_buffers = [
+				np.full(shape, _LETTERBOX_FILL, dtype=frame.dtype)
+				for _ in range(self._pool_size)
+			]
+
+		if not self._free_buffers:
+			# Only reachable with several producers writing at the same time
+			shape = self._letterbox.shape + frame.shape[2:]
+			return np.full(shape, _LETTERBOX_FILL, dtype=frame.dtype), self._letterbox
+
+		return self._free_buffers.pop(), self._letterbox
+
+	def _release_buffer(self, prepared: _PreparedFrame) -> None:
+		"""
+		Returns a buffer to the pool. Must be called with the frame lock held.
+
+		Buffers left over from before a pool rebuild, and extra buffers handed
+		to concurrent producers beyond the pool size, are discarded.
+
+		Args:
+		    prepared: A frame whose buffer was taken with _acquire_buffer.
+		"""
+		if (
+			prepared.letterbox is self._letterbox
+			and len(self._free_buffers) < self._pool_size
+		):
+			self._free_buffers.append(prepared.image)
 
 	def stop(self) -> None:
 		"""Signals the inference thread to stop gracefully and waits for it to finish."""
-		self._stop_event.set()
+		self._mark_stopped()
+		self._frame_event.set()  # Wake the loop if it is waiting for a frame
 		if self._thread is not None:
 			self._thread.join()
@@ -0,0 +1,304 @@
+"""
+Tests for the InferenceEngine frame pipeline.
+
+A stub model stands in for YOLO so frame ownership, letterbox geometry,
+batching and shutdown behaviour can be checked without model weights.
+"""
+
+import queue
+import threading
+from types import SimpleNamespace
+from typing import Any
+
+import numpy as np
+import pytest
+from pydantic import ValidationError
+
+from src.core.inference import (
+	InferenceConfig,
+	InferenceEngine,
+	InferenceEvent,
+	_compute_letterbox,
+	_PreparedFrame,
+)
+
+FRAME_SHAPE = (1080, 1920, 3)
+
+
+class StubModel:
+	"""Mimics the parts of the YOLO call interface the engine relies on."""
+
+	names = {0: "chip"}
+
+	def __init__(self, rows: list[list[float]] | None = None) -> None:
+		self.rows = rows or []
+		self.calls: list[int] = []
+		self.fail = threading.Event()
+
+	def __call__(self, source: Any, **kwargs: Any) -> list[SimpleNamespace]:
+		images = source if isinstance(source, list) else [source]
+		self.calls.append(len(images))
+		if self.fail.is_set():
+			raise RuntimeError("boom")
+		return [fake_result(self.rows) for _ in images]
+
+
+def fake_result(rows: list[list[float]]) -> SimpleNamespace:
+	data = np.array(rows, dtype=np.float32).reshape(-1, 6)
+	return SimpleNamespace(boxes=SimpleNamespace(data=data))
+
+
+def make_engine(
+	monkeypatch: pytest.MonkeyPatch,
+	model: StubModel | None = None,
+	output_queue: queue.Queue[InferenceEvent] | None = None,
+	**config: Any,
+) -> InferenceEngine:
+	stub = model or StubModel()
+	monkeypatch.setattr(InferenceEngine, "_load_model", lambda self: stub)
+	return InferenceEngine(
+		InferenceConfig(warmup_iterations=1, **config),
+		output_queue if output_queue is not None else queue.Queue(),
+	)
+
+
+def test_letterbox_matches_ultralytics() -> None:
+	augment = pytest.importorskip("ultralytics.data.augment")
+	letterbox = augment.LetterBox(new_shape=(640, 640), auto=True, stride=32)
+	random_shapes = np.random.default_rng(0).integers(16, 2000, size=(50, 2))
+	shapes = [(1080, 1920), (480, 640), (300, 300), *random_shapes.tolist()]
+
+	for height, width in shapes:
+		expected = letterbox(image=np.zeros((height, width, 3), np.uint8))
+		assert _compute_letterbox(height, width, 640).shape == expected.shape[:2]
+
+
+@pytest.mark.parametrize("height, width", [(1080, 1920), (480, 640), (300, 300)])
+def test_letterbox_fits_model_input(height: int, width: int) -> None:
+	letterbox = _compute_letterbox(height, width, 640)
+	padded_h, padded_w = letterbox.shape
+
+	assert max(padded_h, padded_w) == 640
+	assert padded_h % 32 == 0 and padded_w % 32 == 0
+	left, top = letterbox.pad
+	assert left + letterbox.size[0] <= padded_w
+	assert top + letterbox.size[1] <= padded_h
+
+
+@pytest.mark.parametrize("frame_shape", [(0, 640), (480, -1)])
+def test_config_rejects_empty_frame_shape(frame_shape: tuple[int, int]) -> None:
+	with pytest.raises(ValidationError):
+		InferenceConfig(frame_shape=frame_shape)
+
+
+def test_extract_detections_round_trips_boxes(
+	monkeypatch: pytest.MonkeyPatch,
+) -> None:
+	engine = make_engine(monkeypatch)
+	engine._names = StubModel.names
+	letterbox = _compute_letterbox(*FRAME_SHAPE[:2], 640)
+	source_box = np.array([300.0, 600.0, 900.0, 960.0])
+	left, top = letterbox.pad
+	boxed = source_box * letterbox.scale + (left, top, left, top)
+	result = fake_result([[*boxed, 0.9, 0]])
+	original = result.boxes.data.copy()
+
+	(detection,) = engine._extract_detections(result, letterbox)
+
+	np.testing.assert_allclose(detection.box, source_box, rtol=1e-5)
+	assert detection.class_name == "chip"
+	np.testing.assert_array_equal(result.boxes.data, original)
+
+
+def test_submit_frame_copies_into_engine_buffer(
+	monkeypatch: pytest.MonkeyPatch,
+) -> None:
+	engine = make_engine(monkeypatch, frame_shape=(480, 640))
+	frame = np.full((480, 640, 3), 7, np.uint8)
+
+	engine.submit_frame(frame)
+	frame[:] = 0  # The caller reuses its array straight away
+
+	(prepared,) = engine._pending_frames
+	assert prepared.image is not frame
+	assert np.all(prepared.image == 7)
+
+
+def test_pending_frames_are_capped_at_max_batch(
+	monkeypatch: pytest.MonkeyPatch,
+) -> None:
+	engine = make_engine(monkeypatch, max_batch=2)
+	frame = np.zeros(FRAME_SHAPE, np.uint8)
+
+	for _ in range(5):
+		engine.submit_frame(frame)
+
+	assert len(engine._pending_frames) == 2
+	assert engine.stats().dropped == 3
+	assert not engine.wait_until_ready(timeout=0)
+
+
+def test_pool_survives_concurrent_producers(monkeypatch: pytest.MonkeyPatch) -> None:
+	engine = make_engine(monkeypatch)
+	frame = np.zeros((120, 160, 3), np.uint8)
+	errors: list[BaseException] = []
+
+	def produce() -> None:
+		try:
+			for _ in range(500):
+				engine.submit_frame(frame)
+		except BaseException as e:
+			errors.append(e)
+
+	producers = [threading.Thread(target=produce) for _ in range(4)]
+	for thread in producers:
+		thread.start()
+	for thread in producers:
+		thread.join()
+
+	assert errors == []
+	assert len(engine._free_buffers) <= engine._pool_size
+
+
+def test_failed_frame_write_returns_its_buffer(
+	monkeypatch: pytest.MonkeyPatch,
+) -> None:
+	engine = make_engine(monkeypatch)
+	frame = np.zeros((480, 640, 3), np.uint8)
+	engine.submit_frame(frame)
+	engine._pending_frames.clear()
+	free = len(engine._free_buffers)
+
+	def fail_to_copy(*args: Any, **kwargs: Any) -> None:
+		raise ValueError("bad frame")
+
+	monkeypatch.setattr(np, "copyto", fail_to_copy)
+	with pytest.raises(ValueError, match="bad frame"):
+		engine.submit_frame(frame)
+
+	assert len(engine._free_buffers) == free
+	assert engine.stats().submitted == 1
+
+
+def test_buffers_from_before_a_shape_change_are_discarded(
+	monkeypatch: pytest.MonkeyPatch,
+) -> None:
+	engine = make_engine(monkeypatch)
+	engine.submit_frame(np.zeros((480, 640, 3), np.uint8))
+	stale: _PreparedFrame = engine._pending_frames.popleft()
+
+	engine.submit_frame(np.zeros(FRAME_SHAPE, np.uint8))
+	with engine._frame_lock:
+		engine._release_buffer(stale)
+
+	expected = _compute_letterbox(*FRAME_SHAPE[:2], 640).shape + (3,)
+	assert all(buffer.shape == expected for buffer in engine._free_buffers)
+	assert len(engine._free_buffers) == engine._pool_size - 1
+
+
+def test_engine_publishes_detections_in_source_coordinates(
+	monkeypatch: pytest.MonkeyPatch,
+) -> None:
+	letterbox = _compute_letterbox(*FRAME_SHAPE[:2], 640)
+	left, top = letterbox.pad
+	model = StubModel([[left, top, left + 64, top + 32, 0.8, 0]])
+	output: queue.Queue[InferenceEvent] = queue.Queue()
+
+	with make_engine(monkeypatch, model, output) as engine:
+		assert engine.started_event.wait(timeout=5)
+		assert engine.is_running()
+		engine.submit_frame(np.zeros(FRAME_SHAPE, np.uint8))
+		event = output.get(timeout=5)
+
+	assert event.error is None
+	(detection,) = event.detections
+	np.testing.assert_allclose(detection.box, (0, 0, 192, 96), rtol=1e-5)
+
+
+def test_batch_failure_is_reported_and_loop_keeps_running(
+	monkeypatch: pytest.MonkeyPatch,
+) -> None:
+	model = StubModel()
+	output: queue.Queue[InferenceEvent] = queue.Queue()
+	frame = np.zeros(FRAME_SHAPE, np.uint8)
+
+	with make_engine(monkeypatch, model, output) as engine:
+		assert engine.started_event.wait(timeout=5)
+		model.fail.set()
+		engine.submit_frame(frame)
+		assert output.get(timeout=5).error == "Inference failed: boom"
+
+		model.fail.clear()
+		engine.submit_frame(frame)
+		assert output.get(timeout=5).error is None
+		assert engine.is_running()
+
+
+def test_load_failure_releases_waiters(monkeypatch: pytest.MonkeyPatch) -> None:
+	def fail_to_load(self: InferenceEngine) -> StubModel:
+		raise FileNotFoundError("missing weights")
+
+	monkeypatch.setattr(InferenceEngine, "_load_model", fail_to_load)
+	output: queue.Queue[InferenceEvent] = queue.Queue()
+	engine = InferenceEngine(InferenceConfig(), output)
+	engine.start()
+
+	assert engine.started_event.wait(timeout=5)
+	assert output.get(timeout=5).error == "Failed to load model: missing weights"
+	assert not engine.is_running()
+	for _ in range(3):
+		engine.submit_frame(np.zeros((120, 160, 3), np.uint8))
+	assert engine.wait_until_ready(timeout=1)
+	engine.stop()
+
+
+def test_engine_restarts_after_a_load_failure(monkeypatch: pytest.MonkeyPatch) -> None:
+	loads: list[StubModel] = []
+
+	def fail_first_load(self: InferenceEngine) -> StubModel:
+		loads.append(StubModel())
+		if len(loads) == 1:
+			raise FileNotFoundError("missing weights")
+		return loads[-1]
+
+	monkeypatch.setattr(InferenceEngine, "_load_model", fail_first_load)
+	output: queue.Queue[InferenceEvent] = queue.Queue()
+	engine = InferenceEngine(InferenceConfig(warmup_iterations=1), output)
+	engine.start()
+	assert engine.started_event.wait(timeout=5)
+	assert output.get(timeout=5).error == "Failed to load model: missing weights"
+
+	# Restart as soon as the failure is seen, while its thread may still be exiting
+	engine.start()
+	assert engine.started_event.wait(timeout=5)
+	assert engine.is_running()
+	engine.submit_frame(np.zeros(FRAME_SHAPE, np.uint8))
+	assert output.get(timeout=5).error is None
+	engine.stop()
+
+
+def test_stop_releases_waiters(monkeypatch: pytest.MonkeyPatch) -> None:
+	engine = make_engine(monkeypatch)
+	engine.stop()
+
+	for _ in range(3):
+		engine.submit_frame(np.zeros((120, 160, 3), np.uint8))
+
+	assert engine.wait_until_ready(timeout=1)
+	assert engine.started_event.is_set()
+	assert not engine.is_running()
+
+
+def test_bounded_output_queue_keeps_latest_and_joins(
+	monkeypatch: pytest.MonkeyPatch,
+) -> None:
+	output: queue.Queue[InferenceEvent] = queue.Queue(maxsize=1)
+	engine = make_engine(monkeypatch, output_queue=output)
+
+	engine._publish(InferenceEvent(error="old"))
+	engine._publish(InferenceEvent(error="new"))
+
+	assert output.get_nowait().error == "new"
+	assert engine.stats().output_dropped == 1
+	output.task_done()
+	output.join()  # Would block forever if the dropped item were not accounted for